@@ -5,6 +5,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import folium
+from folium.plugins import HeatMap
 from streamlit_folium import st_folium
 import requests
 import time
@@ -14,6 +15,9 @@ from geopy.distance import geodesic
 import json
 from typing import Dict, List, Tuple, Optional
 import warnings
+from track_store import TrackStore
+from sector_demand import SectorDemandCounter
+from traffic_density import TrafficDensityGrid
 warnings.filterwarnings('ignore')
 
 # Set page configuration
@@ -122,8 +126,10 @@ class OpenSkyAPI:
 class IraqATFMSystem:
     """Iraq-specific Air Traffic Flow Management System for Overflights"""
     
-    def __init__(self):
+    def __init__(self, track_store: Optional[TrackStore] = None, demand_counter: Optional[SectorDemandCounter] = None):
         self.opensky = OpenSkyAPI()
+        self.track_store = track_store
+        self.demand_counter = demand_counter
         
         # Iraq airspace boundary (approximate)
         self.iraq_boundary = {
@@ -229,6 +235,23 @@ class IraqATFMSystem:
                 
         return df
     
+    def get_sector_bounds(self, sector_id: str) -> Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float]]:
+        """Latitude, longitude and altitude ranges of a sector (simplified rectangular area)"""
+        sector = self.airspace_sectors[sector_id]
+        return (
+            (sector['lat'] - 1.5, sector['lat'] + 1.5),
+            (sector['lon'] - 1.5, sector['lon'] + 1.5),
+            (sector['alt_min'], sector['alt_max'])
+        )
+    
+    def get_sector_history(self, sector_id: str, t0: int, t1: int) -> pd.DataFrame:
+        """Stored airborne positions inside a sector between t0 and t1 (unix seconds)"""
+        if self.track_store is None:
+            return pd.DataFrame()
+        lat_range, lon_range, alt_range = self.get_sector_bounds(sector_id)
+        history = self.track_store.query(t0, t1, lat_range=lat_range, lon_range=lon_range, alt_range=alt_range)
+        return history[~history['on_ground']]
+    
     def calculate_sector_traffic(self, df: pd.DataFrame) -> Dict:
         """Calculate traffic load in each airspace sector"""
         if df is None or df.empty:
@@ -238,16 +261,23 @@ class IraqATFMSystem:
         
         for sector_id, sector in self.airspace_sectors.items():
             # Count aircraft in sector (simplified rectangular area)
+            lat_range, lon_range, alt_range = self.get_sector_bounds(sector_id)
             sector_aircraft = df[
-                (df['latitude'].between(sector['lat'] - 1.5, sector['lat'] + 1.5)) &
-                (df['longitude'].between(sector['lon'] - 1.5, sector['lon'] + 1.5)) &
-                (df['baro_altitude'] >= sector['alt_min']) &
-                (df['baro_altitude'] <= sector['alt_max']) &
+                (df['latitude'].between(*lat_range)) &
+                (df['longitude'].between(*lon_range)) &
+                (df['baro_altitude'].between(*alt_range)) &
                 (df['on_ground'] == False)
             ]
             
             traffic_count = len(sector_aircraft)
-            capacity_util = (traffic_count / sector['capacity']) * 100
+            capacity_util = None
+            demand = {'entry_counts': {}, 'peak_occupancy': {}}
+            if self.demand_counter is not None:
+                # Hourly capacity is compared against rolling entry counts, not just the instantaneous count
+                capacity_util = self.demand_counter.get_utilization(sector_id, sector['capacity'])
+                demand = self.demand_counter.get_demand(sector_id)
+            if capacity_util is None:
+                capacity_util = (traffic_count / sector['capacity']) * 100
             
             # Determine alert level
             if capacity_util >= 85:
@@ -263,6 +293,8 @@ class IraqATFMSystem:
                 'traffic_count': traffic_count,
                 'capacity': sector['capacity'],
                 'capacity_utilization': capacity_util,
+                'entry_counts': demand['entry_counts'],
+                'peak_occupancy': demand['peak_occupancy'],
                 'alert_level': alert_level,
                 'coordinates': (sector['lat'], sector['lon']),
                 'aircraft_list': sector_aircraft['callsign'].tolist() if not sector_aircraft.empty else []
@@ -306,7 +338,25 @@ class IraqATFMSystem:
         
         return analysis
 
-def create_iraq_traffic_map(df: pd.DataFrame, sector_data: Dict, airports: Dict) -> folium.Map:
+@st.cache_resource
+def get_track_store() -> TrackStore:
+    """Track history shared across reruns and sessions"""
+    return TrackStore()
+
+@st.cache_resource
+def get_demand_counter() -> SectorDemandCounter:
+    """Sector demand counters shared across reruns and sessions"""
+    atfm = IraqATFMSystem()
+    return SectorDemandCounter({sector_id: atfm.get_sector_bounds(sector_id) for sector_id in atfm.airspace_sectors})
+
+@st.cache_resource
+def get_density_grid() -> TrafficDensityGrid:
+    """Traffic density grid shared across reruns and sessions"""
+    return TrafficDensityGrid(IraqATFMSystem().iraq_boundary)
+
+def create_iraq_traffic_map(df: pd.DataFrame, sector_data: Dict, airports: Dict,
+                            density_mode: bool = False,
+                            density_points: Optional[List[List[float]]] = None) -> folium.Map:
     """Create interactive map showing Iraq airspace traffic"""
     # Center map on Iraq
     m = folium.Map(location=[33.0, 44.0], zoom_start=6)
@@ -324,41 +374,46 @@ def create_iraq_traffic_map(df: pd.DataFrame, sector_data: Dict, airports: Dict)
         popup="Iraq Airspace"
     ).add_to(m)
     
-    # Add aircraft positions
-    if df is not None and not df.empty:
-        color_map = {
-            'Overflight': 'red',
-            'Arrival/Departure': 'blue',
-            'Domestic': 'green',
-            'Transit': 'orange',
-            'Ground': 'gray',
-            'Unknown': 'purple'
-        }
+    if density_mode:
+        # Add traffic density as one heatmap layer instead of per-aircraft markers
+        if density_points:
+            HeatMap(density_points, radius=25, blur=20, min_opacity=0.3).add_to(m)
+    else:
+        # Add aircraft positions
+        if df is not None and not df.empty:
+            color_map = {
+                'Overflight': 'red',
+                'Arrival/Departure': 'blue',
+                'Domestic': 'green',
+                'Transit': 'orange',
+                'Ground': 'gray',
+                'Unknown': 'purple'
+            }
         
-        for _, aircraft in df.iterrows():
-            flight_type = aircraft.get('flight_type', 'Unknown')
-            color = color_map.get(flight_type, 'purple')
-            
-            popup_text = f"""
-            <b>Callsign:</b> {aircraft.get('callsign', 'N/A')}<br>
-            <b>Country:</b> {aircraft.get('origin_country', 'N/A')}<br>
-            <b>Type:</b> {flight_type}<br>
-            <b>Altitude:</b> {aircraft.get('baro_altitude', 'N/A')} m<br>
-            <b>Velocity:</b> {aircraft.get('velocity', 'N/A')} m/s<br>
-            <b>Track:</b> {aircraft.get('true_track', 'N/A')}°
-            """
-            
-            size = 8 if flight_type == 'Overflight' else 5
-            
-            folium.CircleMarker(
-                location=[aircraft['latitude'], aircraft['longitude']],
-                radius=size,
-                popup=popup_text,
-                color=color,
-                fillColor=color,
-                fillOpacity=0.7,
-                weight=2
-            ).add_to(m)
+            for _, aircraft in df.iterrows():
+                flight_type = aircraft.get('flight_type', 'Unknown')
+                color = color_map.get(flight_type, 'purple')
+            
+                popup_text = f"""
+                <b>Callsign:</b> {aircraft.get('callsign', 'N/A')}<br>
+                <b>Country:</b> {aircraft.get('origin_country', 'N/A')}<br>
+                <b>Type:</b> {flight_type}<br>
+                <b>Altitude:</b> {aircraft.get('baro_altitude', 'N/A')} m<br>
+                <b>Velocity:</b> {aircraft.get('velocity', 'N/A')} m/s<br>
+                <b>Track:</b> {aircraft.get('true_track', 'N/A')}°
+                """
+            
+                size = 8 if flight_type == 'Overflight' else 5
+            
+                folium.CircleMarker(
+                    location=[aircraft['latitude'], aircraft['longitude']],
+                    radius=size,
+                    popup=popup_text,
+                    color=color,
+                    fillColor=color,
+                    fillOpacity=0.7,
+                    weight=2
+                ).add_to(m)
     
     # Add Iraqi airports
     for icao, airport in airports.items():
@@ -404,8 +459,13 @@ def main():
     st.title("🇮🇶 Iraq ATFM System - Overflight Management")
     st.markdown("**Real-time Air Traffic Flow Management for Iraqi Airspace**")
     
-    # Initialize Iraq ATFM system
-    iraq_atfm = IraqATFMSystem()
+    # Initialize Iraq ATFM system; the dashboard runs without track history if its store is unusable
+    try:
+        track_store = get_track_store()
+    except OSError as e:
+        st.warning(f"Track history unavailable: {str(e)}")
+        track_store = None
+    iraq_atfm = IraqATFMSystem(track_store=track_store, demand_counter=get_demand_counter())
     
     # Sidebar controls
     st.sidebar.header("Iraq ATFM Controls")
@@ -419,12 +479,27 @@ def main():
     show_overflights_only = st.sidebar.checkbox("Show Overflights Only", value=False)
     show_sectors = st.sidebar.checkbox("Show Sector Information", value=True)
     
+    # Density mode settings
+    density_grid = get_density_grid()
+    density_mode = st.sidebar.checkbox("Density Mode", value=False)
+    if density_mode:
+        density_history = st.sidebar.slider("Density History (snapshots)", 1, density_grid.snapshots.maxlen, 1)
+        density_band = st.sidebar.selectbox("Density Flight Levels", ["All Levels"] + density_grid.fl_bands)
+        st.sidebar.caption("Density Mode honours \"Show Overflights Only\".")
+    
     # Data fetching
     if auto_refresh or refresh_button or 'iraq_flight_data' not in st.session_state:
         with st.spinner("Fetching real-time flight data for Iraqi airspace..."):
             flight_data = iraq_atfm.get_iraq_traffic()
             if flight_data is not None:
                 flight_data = iraq_atfm.classify_aircraft_type(flight_data)
+                if iraq_atfm.track_store is not None:
+                    try:
+                        iraq_atfm.track_store.append(flight_data)
+                    except OSError as e:
+                        st.warning(f"Error saving track history: {str(e)}")
+                iraq_atfm.demand_counter.update(flight_data)
+                density_grid.add_snapshot(flight_data)
             st.session_state.iraq_flight_data = flight_data
             st.session_state.last_update = datetime.now()
     else:
@@ -475,7 +550,14 @@ def main():
             st.subheader("🗺️ Iraqi Airspace Traffic Map")
             
             # Create and display map
-            traffic_map = create_iraq_traffic_map(display_data, sector_data, iraq_atfm.iraqi_airports)
+            density_points = None
+            if density_mode:
+                fl_band = None if density_band == "All Levels" else density_grid.fl_bands.index(density_band)
+                # The grid is binned per flight type, so the overflight filter applies to the heatmap too
+                flight_types = ['Overflight'] if show_overflights_only else None
+                density_points = density_grid.heatmap_points(density_history, fl_band, flight_types)
+            traffic_map = create_iraq_traffic_map(display_data, sector_data, iraq_atfm.iraqi_airports,
+                                                  density_mode, density_points)
             st_folium(traffic_map, width=800, height=600)
         
         with col_right:
@@ -491,6 +573,7 @@ def main():
                         <strong>{data['name']}</strong><br>
                         Area: {data['area']}<br>
                         Traffic: {data['traffic_count']}/{data['capacity']}<br>
+                        Entries (60 min): {data['entry_counts'].get(60, 0)}/{data['capacity']}<br>
                         Utilization: {data['capacity_utilization']:.1f}%<br>
                         Status: {data['alert_level']}
                     </div>
@@ -539,12 +622,41 @@ def main():
                         st.write(f"**Current Traffic:** {data['traffic_count']}")
                         st.write(f"**Capacity:** {data['capacity']}")
                         st.write(f"**Utilization:** {data['capacity_utilization']:.1f}%")
+                        for minutes, entries in data['entry_counts'].items():
+                            st.write(f"**Entries ({minutes} min):** {entries} (peak occupancy {data['peak_occupancy'][minutes]})")
                     with col_b:
                         st.write(f"**Alert Level:** {data['alert_level']}")
                         if data['aircraft_list']:
                             st.write(f"**Aircraft:** {', '.join(data['aircraft_list'][:5])}")
                             if len(data['aircraft_list']) > 5:
                                 st.write(f"...and {len(data['aircraft_list'])-5} more")
+            
+            # Sector history from the track store
+            if iraq_atfm.track_store is not None and iraq_atfm.track_store.last_timestamp is not None:
+                st.subheader("Sector History")
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    history_sector = st.selectbox("Sector", list(sector_data.keys()),
+                                                  format_func=lambda sid: sector_data[sid]['name'])
+                with col_b:
+                    history_hours = st.slider("History (hours)", 1, 24, 2)
+                t1 = iraq_atfm.track_store.last_timestamp
+                try:
+                    history = iraq_atfm.get_sector_history(history_sector, t1 - history_hours * 3600, t1)
+                except OSError as e:
+                    st.warning(f"Error reading track history: {str(e)}")
+                    history = pd.DataFrame()
+                if history.empty:
+                    st.info("No stored positions in this sector for the selected period.")
+                else:
+                    col_a, col_b = st.columns(2)
+                    col_a.metric("Unique Aircraft", history['icao24'].nunique())
+                    col_b.metric("Stored Positions", len(history))
+                    counts = history.groupby('timestamp')['icao24'].nunique()
+                    counts.index = pd.to_datetime(counts.index, unit='s')
+                    fig = px.line(x=counts.index, y=counts.values, title="Aircraft in Sector per Snapshot",
+                                  labels={'x': 'Time (UTC)', 'y': 'Aircraft'})
+                    st.plotly_chart(fig, use_container_width=True)
         
         with tab2:
             # Overflight flow analysis
@@ -0,0 +1,92 @@
+"""
+Benchmark of DOCX text extraction: the python-docx document model versus the
+streaming extractor in document_processing.
+
+Usage:
+    python benchmarks/bench_docx_extraction.py [manuscript.docx ...]
+
+Without arguments a large synthetic manuscript is generated with python-docx.
+Each extractor runs in a fresh process so that its peak RSS is measured alone.
+"""
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from docx import Document
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from document_processing import iter_text_from_docx  # noqa: E402
+
+PARAGRAPHS = 50000
+TABLE_EVERY = 500
+
+
+def python_docx_text(path):
+    """The previous approach: load the document model and join its paragraphs."""
+    doc = Document(path)
+    return "\n".join(para.text for para in doc.paragraphs)
+
+
+def streaming_text(path):
+    return "\n".join(iter_text_from_docx(path))
+
+
+EXTRACTORS = {
+    'python-docx': python_docx_text,
+    'streaming': streaming_text,
+}
+
+
+def synthetic_manuscript(path, paragraphs=PARAGRAPHS):
+    doc = Document()
+    for i in range(paragraphs):
+        doc.add_paragraph(f"Paragraph {i}: results of the experiment are discussed in detail here. " * 3)
+        if i % TABLE_EVERY == 0:
+            table = doc.add_table(rows=10, cols=4)
+            for row_idx, row in enumerate(table.rows):
+                for col_idx, cell in enumerate(row.cells):
+                    cell.text = f"r{row_idx}c{col_idx}"
+    doc.save(path)
+
+
+def run(name, path, results):
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    text = EXTRACTORS[name](path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((elapsed, peak - baseline, len(text)))
+
+
+def measure(name, path):
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=run, args=(name, path, results))
+    process.start()
+    outcome = results.get()
+    process.join()
+    return outcome
+
+
+def main(paths):
+    tmp_dir = None
+    if not paths:
+        tmp_dir = tempfile.TemporaryDirectory()
+        paths = [os.path.join(tmp_dir.name, "manuscript.docx")]
+        synthetic_manuscript(paths[0])
+
+    for path in paths:
+        print(f"{path} ({os.path.getsize(path) / 2**20:.1f} MiB)")
+        for name in EXTRACTORS:
+            elapsed, rss_growth, chars = measure(name, path)
+            # ru_maxrss is in KiB on Linux
+            print(f"  {name:<12} {elapsed:8.2f} s  {rss_growth / 1024:8.1f} MiB peak RSS growth  {chars:>10} chars")
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,116 @@
+"""
+Micro-benchmark of search result extraction: full BeautifulSoup DOM versus the
+restricted parsers in html_extraction.
+
+Usage:
+    python benchmarks/bench_html_extraction.py [--check] [google:saved_google.html ...]
+
+Each argument is `<provider>:<path to a saved result page>`. Without arguments, the
+saved pages in benchmarks/fixtures (named `<provider>_<case>.html`) are used, plus
+synthetic pages of realistic size for every provider.
+
+Every registered extractor must return the same text as the full DOM parse on every
+page; the script exits with status 1 if one does not. `--check` runs only that check.
+"""
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from html_extraction import EXTRACTORS, PROVIDER_TARGETS  # noqa: E402
+
+REPEATS = 20
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def full_dom(html, target):
+    """The previous approach: parse the whole page, then select."""
+    soup = BeautifulSoup(html, "html.parser")
+    element = soup.select_one(target['tag'] + "".join(f".{name}" for name in target['classes']))
+    return element.get_text() if element else None
+
+
+def synthetic_page(target, blocks=3000):
+    """A page with `blocks` unrelated result blocks and the target element halfway down."""
+    filler = ('<div class="g"><a href="https://example.com/{0}"><h3>Result {0}</h3></a>'
+              '<span class="st">Unrelated text for result {0} &amp; more.</span></div>')
+    classes = " ".join(target['classes'])
+    match = f'<{target["tag"]} class="{classes}">The answer <b>text</b> we want.</{target["tag"]}>'
+    body = [filler.format(i) for i in range(blocks)]
+    body.insert(blocks // 2, match)
+    return "<html><head><title>Results</title></head><body>" + "".join(body) + "</body></html>"
+
+
+def measure(extract, html, target):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        extract(html, target)
+    elapsed = (time.perf_counter() - start) / REPEATS
+
+    tracemalloc.start()
+    extract(html, target)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def load_pages(args):
+    """(provider, source, html) for the pages named on the command line, or the fixtures"""
+    if args:
+        specs = [arg.split(":", 1) for arg in args]
+    else:
+        specs = [
+            (os.path.basename(path).split("_", 1)[0], path)
+            for path in sorted(glob.glob(os.path.join(FIXTURES, "*.html")))
+        ]
+    pages = []
+    for provider, path in specs:
+        with open(path, encoding="utf-8", errors="replace") as file:
+            pages.append((provider, os.path.basename(path), file.read()))
+    if not args:
+        pages += [(provider, "synthetic", synthetic_page(target)) for provider, target in PROVIDER_TARGETS.items()]
+    return pages
+
+
+def check(pages):
+    """Names of the (page, extractor) pairs whose result differs from the full DOM parse"""
+    failures = []
+    for provider, source, html in pages:
+        target = PROVIDER_TARGETS[provider]
+        expected = full_dom(html, target)
+        for name, extract in EXTRACTORS.items():
+            result = extract(html, target)
+            if result != expected:
+                failures.append(f"{name} on {provider} ({source}): {result!r} != {expected!r}")
+    return failures
+
+
+def main(args):
+    check_only = "--check" in args
+    pages = load_pages([arg for arg in args if arg != "--check"])
+
+    failures = check(pages)
+    for failure in failures:
+        print(f"MISMATCH {failure}")
+    if check_only:
+        print(f"{len(pages)} pages, {len(EXTRACTORS)} extractors, {len(failures)} mismatches")
+        return 1 if failures else 0
+
+    candidates = {'full_dom': full_dom, **EXTRACTORS}
+    for provider, source, html in pages:
+        if source != "synthetic" and len(html) < 64 * 1024:
+            continue  # Small fixtures are for the equivalence check only
+        target = PROVIDER_TARGETS[provider]
+        print(f"{provider} ({source}, {len(html) / 1024:.0f} KiB)")
+        for name, extract in candidates.items():
+            elapsed, peak = measure(extract, html, target)
+            print(f"  {name:<10} {elapsed * 1000:8.2f} ms/page  {peak / 1024:9.0f} KiB peak")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,11 +1,28 @@
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
 import PyPDF2
-from docx import Document
 import nltk
-from nltk.tokenize import sent_tokenize
 from nltk.probability import FreqDist
 
+from summarization import extractive_summary
+
 nltk.download('punkt')
 
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+R_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+MC_NS = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+class SectionEnd:
+    """Marks the end of a DOCX section in a part's text stream, with its header/footer relationship ids"""
+
+    def __init__(self, headers, footers):
+        self.headers = headers
+        self.footers = footers
+
 def extract_text(file_path):
     if file_path.endswith('.pdf'):
         return extract_text_from_pdf(file_path)
@@ -14,31 +31,199 @@ def extract_text(file_path):
     else:
         return "Unsupported file format."
 
+def iter_text(file_path):
+    """
+    Yield the text of a document piece by piece (PDF pages, DOCX paragraphs and table rows),
+    so that long documents can be streamed into `summarize_document`.
+    """
+    if file_path.endswith('.pdf'):
+        return iter_text_from_pdf(file_path)
+    elif file_path.endswith('.docx'):
+        return iter_text_from_docx(file_path)
+    else:
+        raise ValueError("Unsupported file format.")
+
+def iter_text_from_pdf(file_path):
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+def iter_text_from_docx(file_path):
+    """
+    Stream paragraphs and table rows (cells separated by tabs) out of a DOCX file
+    without building a document model. A section's properties close it, so its headers
+    and footers follow its body text; footnotes and endnotes follow the body.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        names = set(archive.namelist())
+        relationships = _docx_relationships(archive)
+        emitted = set()
+        with archive.open('word/document.xml') as part:
+            for text in _iter_docx_part(part):
+                if isinstance(text, SectionEnd):
+                    parts = [relationships.get(ref) for ref in text.headers + text.footers]
+                    yield from _iter_docx_parts(archive, [name for name in parts if name], emitted)
+                else:
+                    yield text
+        notes = [name for name in ('word/footnotes.xml', 'word/endnotes.xml') if name in names]
+        # Headers and footers no section refers to
+        unreferenced = sorted(
+            (name for name in names if re.fullmatch(r'word/(header|footer)\d*\.xml', name)),
+            key=lambda name: (name.startswith('word/footer'), int(re.sub(r'\D', '', name) or 0))
+        )
+        yield from _iter_docx_parts(archive, notes + unreferenced, emitted)
+
+def _docx_relationships(archive):
+    """Map relationship ids of word/document.xml to zip member names"""
+    try:
+        rels = archive.open('word/_rels/document.xml.rels')
+    except KeyError:
+        return {}
+    with rels:
+        targets = {}
+        for _, elem in ET.iterparse(rels):
+            if elem.tag == REL_NS + 'Relationship' and elem.get('TargetMode') != 'External':
+                target = elem.get('Target', '')
+                path = target[1:] if target.startswith('/') else posixpath.join('word', target)
+                targets[elem.get('Id')] = posixpath.normpath(path)
+        return targets
+
+def _iter_docx_parts(archive, names, emitted):
+    """Text of each named part that has not been emitted yet"""
+    for name in names:
+        if name in emitted:
+            continue
+        emitted.add(name)
+        try:
+            part = archive.open(name)
+        except KeyError:
+            continue
+        with part:
+            for text in _iter_docx_part(part):
+                if not isinstance(text, SectionEnd):
+                    yield text
+
+def _paragraph_text(paragraph):
+    # Only run content is text; w:pPr also holds w:tab elements that define tab stops
+    parts = []
+    for run in paragraph.iter(W_NS + 'r'):
+        for node in run:
+            if node.tag == W_NS + 't' and node.text:
+                parts.append(node.text)
+            elif node.tag == W_NS + 'tab':
+                parts.append("\t")
+            elif node.tag in (W_NS + 'br', W_NS + 'cr'):
+                parts.append("\n")
+    return "".join(parts)
+
+def _iter_docx_part(part):
+    """
+    Incrementally parse one WordprocessingML part, yielding a SectionEnd where a section
+    ends. Finished elements are dropped from their parent as soon as their text is taken,
+    so memory stays bounded by one paragraph.
+    """
+    parents = []
+    # Open paragraphs and tables, innermost last. A paragraph collects the text of text
+    # boxes anchored in it; a table collects the current cell's texts and nested rows.
+    blocks = []
+    fallback_depth = 0
+    section_end = None
+    for event, elem in ET.iterparse(part, events=('start', 'end')):
+        if event == 'start':
+            parents.append(elem)
+            if elem.tag == MC_NS + 'Fallback':
+                fallback_depth += 1
+            elif fallback_depth:
+                continue
+            elif elem.tag == W_NS + 'p':
+                blocks.append({'texts': []})
+            elif elem.tag == W_NS + 'tbl':
+                blocks.append({'cell': [], 'row': [], 'rows': []})
+            continue
+
+        parents.pop()
+        if elem.tag == MC_NS + 'Fallback':
+            # Legacy copy of content already read from the matching mc:Choice
+            fallback_depth -= 1
+            elem.clear()
+            continue
+        if fallback_depth:
+            continue
+
+        texts = []
+        if elem.tag == W_NS + 'p':
+            # Text boxes come right after the paragraph they are anchored in
+            texts = [_paragraph_text(elem)] + blocks.pop()['texts']
+        elif elem.tag == W_NS + 'tc' and blocks and 'cell' in blocks[-1]:
+            table = blocks[-1]
+            table['row'].append(" ".join(text for text in table['cell'] if text))
+            table['cell'] = []
+        elif elem.tag == W_NS + 'tr' and blocks and 'row' in blocks[-1]:
+            table = blocks[-1]
+            row_text = "\t".join(table['row'])
+            table['row'] = []
+            if len(blocks) == 1:
+                yield row_text
+            else:
+                table['rows'].append(row_text)
+        elif elem.tag == W_NS + 'tbl' and blocks and 'rows' in blocks[-1]:
+            texts = blocks.pop()['rows']
+        elif elem.tag == W_NS + 'sectPr':
+            # A section ending inside a paragraph ends after that paragraph's text
+            section_end = SectionEnd(
+                [ref.get(R_NS + 'id') for ref in elem if ref.tag == W_NS + 'headerReference'],
+                [ref.get(R_NS + 'id') for ref in elem if ref.tag == W_NS + 'footerReference']
+            )
+        else:
+            continue
+
+        if texts:
+            if not blocks:
+                yield from texts
+            elif 'texts' in blocks[-1]:
+                blocks[-1]['texts'].extend(texts)
+            else:
+                blocks[-1]['cell'].extend(texts)
+        if section_end is not None and not blocks:
+            yield section_end
+            section_end = None
+        if parents:
+            parents[-1].clear()
+
 def extract_text_from_pdf(file_path):
-    text = ""
     try:
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                text += page.extract_text() or ""
+        return "".join(iter_text_from_pdf(file_path))
     except Exception as e:
-        text = f"Error extracting text from PDF: {e}"
-    return text
+        return f"Error extracting text from PDF: {e}"
 
 def extract_text_from_docx(file_path):
     try:
-        doc = Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
+        return "\n".join(iter_text_from_docx(file_path))
     except Exception as e:
         return f"Error extracting text from DOCX: {e}"
 
-def summarize_text(text, num_sentences=5):
+def summarize_text(text, num_sentences=5, continued=False):
+    """
+    Extractive summary of `text`, which may be a string or an iterable of chunks;
+    set `continued` when chunks can end mid-sentence, as PDF pages do.
+    """
     try:
-        sentences = sent_tokenize(text)
-        return " ".join(sentences[:num_sentences])
+        return " ".join(extractive_summary(text, num_sentences, continued=continued))
     except Exception as e:
         return f"Error summarizing text: {e}"
 
+def summarize_document(file_path, num_sentences=5):
+    """
+    Extractive summary of a PDF or DOCX file, streamed through `iter_text`.
+    PDF pages can split a sentence; DOCX paragraphs and table rows cannot.
+    """
+    try:
+        chunks = iter_text(file_path)
+    except ValueError as e:
+        return f"Error summarizing text: {e}"
+    return summarize_text(chunks, num_sentences, continued=file_path.endswith('.pdf'))
+
 def extract_keywords(text, num_keywords=5):
     try:
         words = [word.lower() for word in nltk.word_tokenize(text) if word.isalnum()]
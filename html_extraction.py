@@ -0,0 +1,84 @@
+from html.parser import HTMLParser
+
+# Elements each search provider's result page is scraped for
+PROVIDER_TARGETS = {
+    'google': {'tag': 'div', 'classes': ('BNeawe', 's3v9rd', 'AP7Wnd')},  # Google result snippet
+    'dictionary': {'tag': 'span', 'classes': ('one-click-content',)},  # Dictionary.com definition
+}
+
+
+class _TargetFound(Exception):
+    """Raised to stop the streaming parser once the target element is closed."""
+
+
+class _FirstMatchParser(HTMLParser):
+    """Collect the text of the first element matching `tag` with all of `classes`."""
+
+    # Elements that never have an end tag, as in BeautifulSoup's html.parser builder
+    VOID_ELEMENTS = frozenset((
+        'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+        'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+        'image', 'isindex', 'nextid', 'spacer',
+    ))
+    # Elements whose text BeautifulSoup's get_text() leaves out
+    HIDDEN_TEXT_ELEMENTS = frozenset(('script', 'style', 'template'))
+
+    def __init__(self, tag, classes):
+        super().__init__(convert_charrefs=True)
+        self.tag = tag
+        self.classes = frozenset(classes)
+        # Names of the open elements; an end tag closes everything opened after its match
+        self.open_tags = []
+        self.match_depth = None  # Position of the matched element in open_tags
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.match_depth is None and tag == self.tag:
+            for name, value in attrs:
+                if name == 'class' and value and self.classes.issubset(value.split()):
+                    self.match_depth = len(self.open_tags)
+                    break
+        if tag not in self.VOID_ELEMENTS:
+            self.open_tags.append(tag)
+        elif self.match_depth == len(self.open_tags):
+            raise _TargetFound
+
+    def handle_endtag(self, tag):
+        if tag not in self.open_tags:
+            return  # A stray end tag closes nothing
+        depth = len(self.open_tags) - 1 - self.open_tags[::-1].index(tag)
+        del self.open_tags[depth:]
+        if self.match_depth is not None and depth <= self.match_depth:
+            raise _TargetFound
+
+    def handle_data(self, data):
+        if self.match_depth is not None and not self.HIDDEN_TEXT_ELEMENTS.intersection(self.open_tags):
+            self.parts.append(data)
+
+
+def extract_first_streaming(html, target):
+    """
+    Stream `html` through the standard library parser and stop as soon as the first
+    matching element closes. No tree is built; only the matched text is kept.
+    """
+    parser = _FirstMatchParser(target['tag'], target['classes'])
+    try:
+        parser.feed(html)
+        parser.close()
+    except _TargetFound:
+        pass
+    return "".join(parser.parts) if parser.match_depth is not None else None
+
+
+EXTRACTORS = {
+    'stream': extract_first_streaming,
+}
+DEFAULT_EXTRACTOR = 'stream'
+
+
+def extract_first(html, provider, extractor=DEFAULT_EXTRACTOR):
+    """
+    Return the text of the first element targeted for `provider` in `html`,
+    or None if the page has no such element.
+    """
+    return EXTRACTORS[extractor](html, PROVIDER_TARGETS[provider])
@@ -0,0 +1,116 @@
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Rolling windows in seconds; capacities are stated per hour and prorated to each window
+DEMAND_WINDOWS = (900, 1800, 3600)
+
+Bounds = Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float]]
+
+
+class SlidingWindow:
+    """Entry count and occupancy peak over the last `seconds`, updated in O(1) amortized time"""
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.entries = deque()  # (timestamp, entries in that snapshot)
+        self.entry_count = 0
+        # Monotonic queue of (timestamp, occupancy) with decreasing occupancy; the front is the peak
+        self.occupancy = deque()
+
+    def update(self, timestamp: int, entries: int, occupancy: int):
+        if entries:
+            self.entries.append((timestamp, entries))
+            self.entry_count += entries
+        while self.occupancy and self.occupancy[-1][1] <= occupancy:
+            self.occupancy.pop()
+        self.occupancy.append((timestamp, occupancy))
+
+        horizon = timestamp - self.seconds
+        while self.entries and self.entries[0][0] <= horizon:
+            self.entry_count -= self.entries.popleft()[1]
+        while self.occupancy[0][0] <= horizon:
+            self.occupancy.popleft()
+
+    @property
+    def peak_occupancy(self) -> int:
+        return self.occupancy[0][1] if self.occupancy else 0
+
+
+class SectorDemandCounter:
+    """Incremental sector entry/exit detection with rolling entry counts and occupancy peaks"""
+
+    def __init__(self, sector_bounds: Dict[str, Bounds], windows: Tuple[int, ...] = DEMAND_WINDOWS,
+                 max_gap: Optional[int] = None):
+        self.sector_bounds = sector_bounds
+        # Snapshots further apart than this cannot tell when aircraft entered
+        self.max_gap = max_gap if max_gap is not None else min(windows)
+        self.windows = {
+            sector_id: {seconds: SlidingWindow(seconds) for seconds in windows}
+            for sector_id in sector_bounds
+        }
+        self.occupants = {sector_id: set() for sector_id in sector_bounds}
+        self.last_timestamp = None
+        # Shared across Streamlit sessions, which run in separate threads
+        self._lock = threading.Lock()
+
+    def update(self, df: pd.DataFrame) -> Dict[str, Dict[str, List[str]]]:
+        """Feed a snapshot; returns the icao24s that entered and exited each sector since the last one"""
+        if df is None or df.empty:
+            return {}
+        timestamp = int(df['timestamp'].max())
+        with self._lock:
+            return self._update(df, timestamp)
+
+    def _update(self, df: pd.DataFrame, timestamp: int) -> Dict[str, Dict[str, List[str]]]:
+        # Repeated or late snapshots would double count entries
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return {}
+        # The first snapshot, or the first after a long gap, only establishes who is in each sector
+        baseline = self.last_timestamp is None or timestamp - self.last_timestamp > self.max_gap
+
+        airborne = df['on_ground'] == False
+        changes = {}
+        for sector_id, (lat_range, lon_range, alt_range) in self.sector_bounds.items():
+            inside = (
+                airborne &
+                df['latitude'].between(*lat_range) &
+                df['longitude'].between(*lon_range) &
+                df['baro_altitude'].between(*alt_range)
+            )
+            occupants = set(df.loc[inside, 'icao24'])
+            previous = self.occupants[sector_id]
+            entered = set() if baseline else occupants - previous
+            exited = set() if baseline else previous - occupants
+            self.occupants[sector_id] = occupants
+
+            for window in self.windows[sector_id].values():
+                window.update(timestamp, len(entered), len(occupants))
+            changes[sector_id] = {'entered': sorted(entered), 'exited': sorted(exited)}
+
+        self.last_timestamp = timestamp
+        return changes
+
+    def get_demand(self, sector_id: str) -> Dict[str, Dict[int, int]]:
+        """Entry counts and occupancy peaks per window, keyed by window length in minutes"""
+        windows = self.windows[sector_id]
+        with self._lock:
+            return {
+                'entry_counts': {seconds // 60: window.entry_count for seconds, window in windows.items()},
+                'peak_occupancy': {seconds // 60: window.peak_occupancy for seconds, window in windows.items()}
+            }
+
+    def get_utilization(self, sector_id: str, hourly_capacity: float) -> Optional[float]:
+        """
+        Highest demand as a percentage of capacity: current occupancy against the hourly
+        capacity, or entries in any window against the capacity prorated to that window
+        """
+        with self._lock:
+            if self.last_timestamp is None:
+                return None
+            utilizations = [len(self.occupants[sector_id]) / hourly_capacity]
+            for seconds, window in self.windows[sector_id].items():
+                utilizations.append(window.entry_count / (hourly_capacity * seconds / 3600))
+        return max(utilizations) * 100
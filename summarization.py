@@ -0,0 +1,161 @@
+import heapq
+import re
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from nltk.tokenize import sent_tokenize
+import nltk
+
+# Ensure the NLTK Punkt tokenizer is downloaded
+nltk.download('punkt', quiet=True)
+
+BLOCK_SIZE = 200  # Sentences ranked together; bounds the similarity matrix per block
+CANDIDATES_PER_SENTENCE = 4  # Block winners kept per requested summary sentence
+MAX_SENTENCE_CHARS = 2000  # Longest run of text held back waiting for a sentence end
+MIN_SENTENCE_WORDS = 2  # Fewer words than this is a label or page number, not a sentence
+MIN_UNPUNCTUATED_WORDS = 8  # Text without a sentence end must be at least this long to count
+SENTENCE_END = re.compile(r"[.!?:;\u2026][\"'\u2019\u201d)\]]*$")
+DAMPING = 0.85
+
+
+def _is_sentence(fragment):
+    """Whether a tokenizer fragment reads as a sentence rather than a heading, caption or table row."""
+    if "\t" in fragment:
+        return False
+    words = sum(1 for word in fragment.split() if any(char.isalpha() for char in word))
+    if words < MIN_SENTENCE_WORDS:
+        return False
+    # Unpunctuated text only passes when it is long enough to be running prose
+    return bool(SENTENCE_END.search(fragment)) or words >= MIN_UNPUNCTUATED_WORDS
+
+
+def _split_long(text, max_sentence_chars):
+    """Tokenize `text`, cutting any run longer than `max_sentence_chars` into pieces."""
+    for sentence in sent_tokenize(text):
+        for start in range(0, len(sentence), max_sentence_chars):
+            yield sentence[start:start + max_sentence_chars]
+
+
+def iter_sentences(chunks, continued=False, max_sentence_chars=MAX_SENTENCE_CHARS):
+    """
+    Yield sentences from a string or an iterable of text chunks, skipping fragments
+    that contain no sentence. Chunk boundaries are sentence breaks (DOCX paragraphs
+    and table rows) unless `continued` is set for sources whose chunks can end
+    mid-sentence (PDF pages); then the unfinished tail of a chunk is carried over.
+    """
+    if isinstance(chunks, str):
+        chunks = (chunks,)
+    pending = ""
+    for chunk in chunks:
+        if not chunk or not chunk.strip():
+            continue
+        if not continued:
+            yield from filter(_is_sentence, _split_long(chunk, max_sentence_chars))
+            continue
+        pending = f"{pending}\n{chunk}" if pending else chunk
+        sentences = sent_tokenize(pending)
+        pending = sentences.pop() if sentences else ""
+        yield from filter(_is_sentence, sentences)
+        while len(pending) > max_sentence_chars:
+            fragment, pending = pending[:max_sentence_chars], pending[max_sentence_chars:]
+            if _is_sentence(fragment):
+                yield fragment
+    if pending.strip():
+        yield from filter(_is_sentence, _split_long(pending, max_sentence_chars))
+
+
+def _normalize(sentence):
+    """Key under which repeated sentences (running headers, boilerplate) count as one."""
+    return " ".join(re.findall(r"\w+", sentence.lower()))
+
+
+def textrank_scores(sentences, damping=DAMPING, max_iter=100, tol=1e-6):
+    """
+    Score sentences with TextRank over the TF-IDF cosine similarity graph.
+    Scores sum to 1.
+    """
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0)
+    try:
+        tfidf = TfidfVectorizer(stop_words="english").fit_transform(sentences)
+    except ValueError:
+        # Nothing but stop words or punctuation: every sentence is equally central
+        return np.full(n, 1.0 / n)
+
+    # Rows are L2-normalised, so the product is the cosine similarity
+    similarity = (tfidf @ tfidf.T).tocsr()
+    similarity = (similarity - sparse.diags(similarity.diagonal())).tocsr()
+    similarity.eliminate_zeros()
+
+    out_weight = np.asarray(similarity.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    out_weight[dangling] = 1.0
+    transition_t = (sparse.diags(1.0 / out_weight) @ similarity).T.tocsr()
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        updated = (1 - damping) / n + damping * (transition_t @ scores + scores[dangling].sum() / n)
+        converged = np.abs(updated - scores).sum() < tol
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def _rank_block(pool, pool_keys, block, pool_size):
+    """Merge one block of (position, sentence, key) triples into the bounded candidate heap."""
+    # Scale by block size so that scores from blocks of different lengths compare
+    scores = textrank_scores([sentence for _, sentence, _ in block]) * len(block)
+    for (position, sentence, key), score in zip(block, scores):
+        entry = (score, -position, sentence, key)  # On ties the earlier sentence wins
+        if len(pool) < pool_size:
+            heapq.heappush(pool, entry)
+        elif entry > pool[0]:
+            pool_keys.discard(heapq.heapreplace(pool, entry)[3])
+        else:
+            continue
+        pool_keys.add(key)
+
+
+def extractive_summary(chunks, num_sentences=5, block_size=BLOCK_SIZE, continued=False):
+    """
+    Select the `num_sentences` most central sentences of a text, in document order.
+
+    `chunks` is a string or any iterable of text chunks, such as
+    `document_processing.iter_text(file_path)`; set `continued` when chunks can end
+    mid-sentence, as PDF pages do. Sentences are ranked with TextRank in blocks of
+    `block_size`, and only the best candidates are kept between blocks, so memory is
+    bounded and cost grows linearly with the length of the document. A sentence
+    repeating one already in its block or among the candidates is skipped, so
+    repeats neither crowd the summary nor inflate each other's scores. The surviving
+    candidates are re-ranked against each other for the final pick.
+    """
+    if num_sentences <= 0:
+        return []
+    pool_size = num_sentences * CANDIDATES_PER_SENTENCE
+    pool = []
+    pool_keys = set()
+    block = []
+    block_keys = set()
+    for position, sentence in enumerate(iter_sentences(chunks, continued)):
+        key = _normalize(sentence)
+        if key in block_keys or key in pool_keys:
+            continue
+        block_keys.add(key)
+        block.append((position, sentence, key))
+        if len(block) == block_size:
+            _rank_block(pool, pool_keys, block, pool_size)
+            block = []
+            block_keys = set()
+    if block:
+        _rank_block(pool, pool_keys, block, pool_size)
+
+    candidates = sorted(pool, key=lambda entry: -entry[1])
+    if len(candidates) > num_sentences:
+        block_scores = np.array([entry[0] for entry in candidates])
+        scores = textrank_scores([entry[2] for entry in candidates]) * block_scores
+        keep = np.sort(np.argsort(-scores, kind="stable")[:num_sentences])
+        candidates = [candidates[i] for i in keep]
+    return [entry[2] for entry in candidates]
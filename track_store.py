@@ -0,0 +1,231 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Flight types are stored as small integer codes
+FLIGHT_TYPES = ('Unknown', 'Overflight', 'Arrival/Departure', 'Domestic', 'Transit', 'Ground')
+FLIGHT_TYPE_CODES = {name: code for code, name in enumerate(FLIGHT_TYPES)}
+
+# Fixed schema of one aircraft position; on disk each field is a separate raw column file per chunk
+TRACK_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('icao24', 'S6'),
+    ('callsign', 'S8'),
+    ('origin_country', 'S32'),
+    ('latitude', '<f8'),
+    ('longitude', '<f8'),
+    ('baro_altitude', '<f4'),
+    ('velocity', '<f4'),
+    ('true_track', '<f4'),
+    ('vertical_rate', '<f4'),
+    ('on_ground', '?'),
+    ('flight_type', 'u1'),
+])
+STRING_FIELDS = ('icao24', 'callsign', 'origin_country')
+FLOAT_FIELDS = ('latitude', 'longitude', 'baro_altitude', 'velocity', 'true_track', 'vertical_rate')
+
+Range = Optional[Tuple[float, float]]
+
+# Next to the code rather than the working directory, so every launch finds the same history
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'track_store')
+
+
+def snapshot_to_records(df: pd.DataFrame, timestamp: int) -> np.ndarray:
+    """Convert a classified snapshot into TRACK_DTYPE rows stamped with `timestamp`"""
+    records = np.zeros(len(df), dtype=TRACK_DTYPE)
+    records['timestamp'] = timestamp
+    for field in STRING_FIELDS:
+        if field in df.columns:
+            values = df[field].fillna('').astype(str).str.strip().str.encode('utf-8')
+            records[field] = values.to_numpy(dtype=TRACK_DTYPE[field])
+    for field in FLOAT_FIELDS:
+        if field in df.columns:
+            records[field] = pd.to_numeric(df[field], errors='coerce').to_numpy(dtype='float64')
+        else:
+            records[field] = np.nan
+    if 'on_ground' in df.columns:
+        records['on_ground'] = df['on_ground'].fillna(False).astype(bool).to_numpy()
+    if 'flight_type' in df.columns:
+        records['flight_type'] = df['flight_type'].map(FLIGHT_TYPE_CODES).fillna(0).to_numpy(dtype='uint8')
+    return records
+
+
+def records_to_dataframe(records: np.ndarray) -> pd.DataFrame:
+    """Convert TRACK_DTYPE rows back into a DataFrame shaped like an OpenSky snapshot"""
+    data = {}
+    for field in TRACK_DTYPE.names:
+        if field in STRING_FIELDS:
+            data[field] = np.char.decode(records[field], 'utf-8', 'ignore')
+        elif field == 'flight_type':
+            data[field] = np.array(FLIGHT_TYPES)[records[field]]
+        else:
+            data[field] = np.asarray(records[field])
+    return pd.DataFrame(data)
+
+
+class TrackStore:
+    """Append-only columnar history of classified snapshots, memory-mapped and partitioned by time"""
+
+    def __init__(self, root: str = DEFAULT_ROOT, chunk_seconds: int = 3600, ring_snapshots: int = 120):
+        self.root = root
+        self.chunk_seconds = chunk_seconds
+        # Most recent snapshots kept in RAM as (timestamp, records)
+        self.recent = deque(maxlen=ring_snapshots)
+        # Shared across Streamlit sessions, which run in separate threads
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        # Each chunk is a directory named after its start time
+        self.chunks = sorted(int(name) for name in os.listdir(root) if name.isdigit())
+        # chunk start -> {icao24: [first_seen, last_seen]}, loaded lazily from the sidecar files
+        self._index: Dict[int, Dict[str, List[int]]] = {}
+        self.last_timestamp = None
+        if self.chunks:
+            timestamps = self._load_column(self.chunks[-1], 'timestamp')
+            if len(timestamps):
+                self.last_timestamp = int(timestamps[-1])
+
+    def _column_path(self, chunk: int, field: str) -> str:
+        return os.path.join(self.root, str(chunk), f"{field}.col")
+
+    def _index_path(self, chunk: int) -> str:
+        return os.path.join(self.root, str(chunk), "index.json")
+
+    def _chunk_rows(self, chunk: int) -> int:
+        """Complete rows in a chunk: an interrupted append can leave columns of unequal length"""
+        rows = []
+        for field in TRACK_DTYPE.names:
+            path = self._column_path(chunk, field)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            rows.append(size // TRACK_DTYPE[field].itemsize)
+        return min(rows)
+
+    def _load_column(self, chunk: int, field: str, rows: Optional[int] = None) -> np.ndarray:
+        """Memory-map one column of a chunk, limited to its complete rows"""
+        if rows is None:
+            rows = self._chunk_rows(chunk)
+        if rows == 0:
+            return np.zeros(0, dtype=TRACK_DTYPE[field])
+        return np.memmap(self._column_path(chunk, field), dtype=TRACK_DTYPE[field], mode='r', shape=(rows,))
+
+    def _chunk_index(self, chunk: int) -> Dict[str, List[int]]:
+        """Per-chunk icao24 index, rebuilt from the chunk itself if the sidecar is missing"""
+        if chunk not in self._index:
+            try:
+                with open(self._index_path(chunk)) as file:
+                    self._index[chunk] = json.load(file)
+            except (OSError, ValueError):
+                index = {}
+                rows = self._chunk_rows(chunk)
+                icao24s = np.char.decode(self._load_column(chunk, 'icao24', rows), 'utf-8', 'ignore')
+                for icao24, timestamp in zip(icao24s, self._load_column(chunk, 'timestamp', rows)):
+                    seen = index.setdefault(icao24, [int(timestamp), int(timestamp)])
+                    seen[1] = int(timestamp)
+                self._index[chunk] = index
+        return self._index[chunk]
+
+    def append(self, df: pd.DataFrame) -> int:
+        """Append a classified snapshot; returns the number of rows written"""
+        if df is None or df.empty:
+            return 0
+        timestamp = int(df['timestamp'].max()) if 'timestamp' in df.columns else int(time.time())
+        records = snapshot_to_records(df, timestamp)
+        chunk = timestamp - timestamp % self.chunk_seconds
+
+        with self._lock:
+            # Chunks must stay sorted by time; a repeated or late snapshot is dropped
+            if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+                return 0
+
+            os.makedirs(os.path.join(self.root, str(chunk)), exist_ok=True)
+            # Cut every column back to the last complete row so an interrupted append
+            # cannot leave later rows misaligned
+            rows = self._chunk_rows(chunk)
+            for field in TRACK_DTYPE.names:
+                path = self._column_path(chunk, field)
+                size = rows * TRACK_DTYPE[field].itemsize
+                if os.path.exists(path) and os.path.getsize(path) != size:
+                    os.truncate(path, size)
+                with open(path, 'ab') as file:
+                    file.write(np.ascontiguousarray(records[field]).tobytes())
+            if chunk not in self.chunks:
+                bisect.insort(self.chunks, chunk)
+
+            index = self._chunk_index(chunk)
+            for icao24 in np.char.decode(np.unique(records['icao24']), 'utf-8', 'ignore'):
+                index.setdefault(icao24, [timestamp, timestamp])[1] = timestamp
+            tmp_path = self._index_path(chunk) + '.tmp'
+            with open(tmp_path, 'w') as file:
+                json.dump(index, file)
+            os.replace(tmp_path, self._index_path(chunk))
+
+            self.recent.append((timestamp, records))
+            self.last_timestamp = timestamp
+        return len(records)
+
+    def _chunks_between(self, t0: int, t1: int, icao24: Optional[str] = None) -> List[int]:
+        """Chunks overlapping [t0, t1], skipping those the index says lack `icao24`"""
+        lo = bisect.bisect_left(self.chunks, t0 - self.chunk_seconds + 1)
+        hi = bisect.bisect_right(self.chunks, t1)
+        chunks = self.chunks[lo:hi]
+        if icao24 is not None:
+            chunks = [
+                chunk for chunk in chunks
+                if icao24 in self._chunk_index(chunk)
+                and self._chunk_index(chunk)[icao24][0] <= t1
+                and self._chunk_index(chunk)[icao24][1] >= t0
+            ]
+        return chunks
+
+    def _read_range(self, chunk: int, t0: int, t1: int) -> Dict[str, np.ndarray]:
+        """
+        Columns of a chunk sliced to [t0, t1]. Rows are time-sorted, so the binary search
+        only touches a few pages of the timestamp column; other columns are mapped lazily.
+        """
+        rows = self._chunk_rows(chunk)
+        timestamps = self._load_column(chunk, 'timestamp', rows)
+        lo = np.searchsorted(timestamps, t0, side='left')
+        hi = np.searchsorted(timestamps, t1, side='right')
+        return {field: self._load_column(chunk, field, rows)[lo:hi] for field in TRACK_DTYPE.names}
+
+    def query(self, t0: int, t1: int, icao24: Optional[str] = None,
+              lat_range: Range = None, lon_range: Range = None, alt_range: Range = None) -> pd.DataFrame:
+        """Positions with t0 <= timestamp <= t1 that match every given filter"""
+        with self._lock:
+            if self.recent and t0 >= self.recent[0][0]:
+                blocks = [records for timestamp, records in self.recent if t0 <= timestamp <= t1]
+            else:
+                blocks = [self._read_range(chunk, t0, t1) for chunk in self._chunks_between(t0, t1, icao24)]
+
+        selected = []
+        for block in blocks:
+            # Blocks are record arrays (ring buffer) or dicts of column maps (chunks)
+            mask = np.ones(len(block['timestamp']), dtype=bool)
+            if icao24 is not None:
+                mask &= block['icao24'] == icao24.encode('utf-8')
+            for field, bounds in (('latitude', lat_range), ('longitude', lon_range), ('baro_altitude', alt_range)):
+                if bounds is not None:
+                    values = block[field]
+                    mask &= (values >= bounds[0]) & (values <= bounds[1])
+            records = np.zeros(int(mask.sum()), dtype=TRACK_DTYPE)
+            for field in TRACK_DTYPE.names:
+                records[field] = block[field][mask]
+            selected.append(records)
+
+        records = np.concatenate(selected) if selected else np.zeros(0, dtype=TRACK_DTYPE)
+        return records_to_dataframe(records)
+
+    def tracks(self, last_seconds: int = 7200, icao24: Optional[str] = None, now: Optional[int] = None) -> pd.DataFrame:
+        """Per-aircraft tracks over the last `last_seconds`, ordered by aircraft then time"""
+        if now is None:
+            now = self.last_timestamp
+        if now is None:
+            return records_to_dataframe(np.zeros(0, dtype=TRACK_DTYPE))
+        df = self.query(now - last_seconds, now, icao24=icao24)
+        return df.sort_values(['icao24', 'timestamp'], kind='stable').reset_index(drop=True)
@@ -0,0 +1,111 @@
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from track_store import FLIGHT_TYPE_CODES, FLIGHT_TYPES
+
+FEET_PER_METER = 3.28084
+# Flight level band edges; aircraft above the last edge fall into the top band
+DEFAULT_FL_EDGES = (0, 100, 200, 300, 400)
+
+
+class TrafficDensityGrid:
+    """Aircraft counts on a lat/lon/flight-level/flight-type grid, kept as a running sum over the last snapshots"""
+
+    def __init__(self, boundary: Dict[str, float], cell_degrees: float = 0.25,
+                 fl_edges: Tuple[int, ...] = DEFAULT_FL_EDGES, history: int = 10):
+        self.boundary = boundary
+        self.cell_degrees = cell_degrees
+        self.fl_edges = np.asarray(fl_edges, dtype=float)
+        self.shape = (
+            int(np.ceil((boundary['lat_max'] - boundary['lat_min']) / cell_degrees)),
+            int(np.ceil((boundary['lon_max'] - boundary['lon_min']) / cell_degrees)),
+            len(fl_edges),
+            len(FLIGHT_TYPES)
+        )
+        self.snapshots = deque(maxlen=history)
+        self.total = np.zeros(self.shape, dtype=np.int64)
+        self.last_timestamp = None
+        # Shared across Streamlit sessions, which run in separate threads
+        self._lock = threading.Lock()
+
+    @property
+    def fl_bands(self) -> List[str]:
+        """Labels of the flight level bands, lowest first"""
+        edges = [int(edge) for edge in self.fl_edges]
+        labels = [f"FL{low:03d}-FL{high:03d}" for low, high in zip(edges[:-1], edges[1:])]
+        return labels + [f"FL{edges[-1]:03d}+"]
+
+    def bin_snapshot(self, df: pd.DataFrame) -> np.ndarray:
+        """Count the aircraft of one snapshot per grid cell in a single bincount pass"""
+        lat = df['latitude'].to_numpy(dtype=float)
+        lon = df['longitude'].to_numpy(dtype=float)
+        altitude = pd.to_numeric(df['baro_altitude'], errors='coerce').to_numpy(dtype=float)
+        flight_level = np.nan_to_num(altitude, nan=0.0) * FEET_PER_METER / 100
+
+        inside = (
+            (lat >= self.boundary['lat_min']) & (lat <= self.boundary['lat_max']) &
+            (lon >= self.boundary['lon_min']) & (lon <= self.boundary['lon_max'])
+        )
+        if 'flight_type' in df.columns:
+            type_code = df['flight_type'].map(FLIGHT_TYPE_CODES).fillna(0).to_numpy(dtype=int)
+        else:
+            type_code = np.zeros(len(df), dtype=int)
+
+        n_lat, n_lon, n_fl, n_types = self.shape
+        lat_idx = np.minimum(((lat[inside] - self.boundary['lat_min']) / self.cell_degrees).astype(int), n_lat - 1)
+        lon_idx = np.minimum(((lon[inside] - self.boundary['lon_min']) / self.cell_degrees).astype(int), n_lon - 1)
+        fl_idx = np.clip(np.searchsorted(self.fl_edges, flight_level[inside], side='right') - 1, 0, n_fl - 1)
+
+        flat = ((lat_idx * n_lon + lon_idx) * n_fl + fl_idx) * n_types + type_code[inside]
+        return np.bincount(flat, minlength=n_lat * n_lon * n_fl * n_types).reshape(self.shape)
+
+    def add_snapshot(self, df: pd.DataFrame):
+        """Bin a new snapshot and roll it into the running sum, dropping the oldest one"""
+        if df is None or df.empty:
+            return
+        timestamp = int(df['timestamp'].max())
+        counts = self.bin_snapshot(df)
+        with self._lock:
+            if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+                return
+            if len(self.snapshots) == self.snapshots.maxlen:
+                self.total -= self.snapshots[0]
+            self.snapshots.append(counts)
+            self.total += counts
+            self.last_timestamp = timestamp
+
+    def density(self, last_n: Optional[int] = None, fl_band: Optional[int] = None,
+                flight_types: Optional[List[str]] = None) -> np.ndarray:
+        """
+        Mean aircraft per lat/lon cell over the last `last_n` snapshots, for one flight
+        level band or all levels, and for the given flight types or all of them
+        """
+        with self._lock:
+            if not self.snapshots:
+                return np.zeros(self.shape[:2])
+            if last_n is None or last_n >= len(self.snapshots):
+                last_n = len(self.snapshots)
+                grid = self.total.copy()
+            else:
+                grid = np.sum(list(self.snapshots)[-last_n:], axis=0)
+        if flight_types is not None:
+            grid = grid[..., [FLIGHT_TYPE_CODES[name] for name in flight_types]]
+        grid = grid.sum(axis=3)
+        grid = grid[:, :, fl_band] if fl_band is not None else grid.sum(axis=2)
+        return grid / last_n
+
+    def heatmap_points(self, last_n: Optional[int] = None, fl_band: Optional[int] = None,
+                       flight_types: Optional[List[str]] = None) -> List[List[float]]:
+        """[lat, lon, weight] at the centre of every occupied cell, weights scaled to (0, 1]"""
+        grid = self.density(last_n, fl_band, flight_types)
+        if grid.max() > 0:
+            # Leaflet.heat saturates at a weight of 1, so the busiest cell is scaled to 1
+            grid = grid / grid.max()
+        lat_idx, lon_idx = np.nonzero(grid)
+        lat = self.boundary['lat_min'] + (lat_idx + 0.5) * self.cell_degrees
+        lon = self.boundary['lon_min'] + (lon_idx + 0.5) * self.cell_degrees
+        return np.column_stack([lat, lon, grid[lat_idx, lon_idx]]).tolist()
@@ -1,10 +1,7 @@
 import requests
-from bs4 import BeautifulSoup
-from nltk.tokenize import sent_tokenize
-import nltk
 
-# Ensure the NLTK Punkt tokenizer is downloaded
-nltk.download('punkt', quiet=True)
+from html_extraction import extract_first
+from summarization import extractive_summary
 
 def search_google_snippet(query):
     """
@@ -15,10 +12,9 @@ def search_google_snippet(query):
     try:
         response = requests.get(search_url, headers=headers, timeout=10)
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, "html.parser")
-            snippets = soup.select("div.BNeawe.s3v9rd.AP7Wnd")  # Updated selector for Google snippets
-            if snippets:
-                return snippets[0].get_text()  # Return the first snippet
+            snippet = extract_first(response.text, "google")
+            if snippet is not None:
+                return snippet  # Return the first snippet
         return "No relevant information found."
     except Exception as e:
         return f"Error fetching Google results: {e}"
@@ -31,22 +27,21 @@ def search_dictionary(query):
     try:
         response = requests.get(search_url, timeout=10)
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, "html.parser")
-            definition = soup.find("span", class_="one-click-content")
-            if definition:
-                return definition.get_text()
+            definition = extract_first(response.text, "dictionary")
+            if definition is not None:
+                return definition
         return "No definition found."
     except Exception as e:
         return f"Error fetching dictionary results: {e}"
 
 def summarize_text(text, num_sentences=3):
     """
-    Summarize the given text by extracting the first `num_sentences`.
+    Summarize the given text by extracting its `num_sentences` most central sentences.
     """
-    sentences = sent_tokenize(text)
+    sentences = extractive_summary(text, num_sentences)
     if not sentences:
         return "No content available to summarize."
-    return " ".join(sentences[:num_sentences])
+    return " ".join(sentences)
 
 def search_and_summarize(query):
     """